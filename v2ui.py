@@ -1,6 +1,13 @@
 """
 Centrifuge Control System - Frontend UI with Arduino Communication
 Updated version with serial communication
+
+Performance profile:
+The hot path is the serial reader -> JSON status parse -> Tk update, at
+roughly 5 Hz. It is bound by serial latency and Python object churn, not
+CPU; there is no numeric inner loop, so SIMD/GPU/Numba do not apply.
+Worthwhile optimizations reduce syscalls, allocations, threads and locks
+per status frame.
 """
 
 import tkinter as tk
@@ -10,6 +17,42 @@ import serial.tools.list_ports
 import json
 import time
 import threading
+import collections
+
+# orjson parses bytes directly and is several times faster; it's optional
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+
+# USB (vid, pid) pairs for Arduino boards and common clone USB-serial chips.
+# A pid of None matches any product from that vendor.
+ARDUINO_VIDPID = {
+    (0x2341, None),      # Arduino
+    (0x0403, 0x6001),    # FTDI FT232
+    (0x1a86, 0x7523),    # CH340
+    (0x10c4, 0xea60),    # CP210x
+    (0x16c0, None),      # Teensy / V-USB
+}
+
+# Fallback port description keywords when no VID:PID matches
+PORT_KEYWORDS = ('Arduino', 'USB')
+
+# The Arduino watchdog needs to hear from us at least this often (seconds)
+PING_INTERVAL = 2.0
+
+# Sentinel for status fields missing from a frame
+_MISSING = object()
+
+STATE_COLORS = {
+    'IDLE': '#27ae60',
+    'RAMPING_UP': '#f39c12',
+    'RUNNING': '#27ae60',
+    'RAMPING_DOWN': '#e67e22',
+    'ERROR': '#e74c3c'
+}
 
 
 class CentrifugeUI:
@@ -24,6 +67,26 @@ class CentrifugeUI:
         self.serial_connected = False
         self.serial_thread = None
         self.running_thread = True
+        self._rx_buf = bytearray()
+        self._last_tx_monotonic = 0.0
+        # Latest status frame only; the UI drains it at ~30 FPS
+        self._pending_status = collections.deque(maxlen=1)
+        # Last value applied per status field, so unchanged fields are skipped
+        self._last = {}
+        # Status frame key -> widget updater, bound once
+        self._status_fields = (
+            ('currentRPM', self._show_rpm),
+            ('state', self._show_state),
+            ('lidClosed', self._show_lid),
+            ('level', self._show_level),
+            ('remainingMs', self._show_remaining),
+        )
+        # Text protocol lines are dispatched on the part before the first ':'
+        self._line_handlers = {
+            b'STATE': self._on_state_line,
+            b'ERROR': self._on_error_line,
+            b'STATUS': self._on_status_line,
+        }
 
         # State variables
         self.target_rpm = tk.IntVar(value=0)
@@ -48,6 +111,7 @@ class CentrifugeUI:
 
         # Try to auto-connect
         self.root.after(100, self._auto_connect)
+        self.root.after(33, self._drain_status)
 
     def _create_connection_bar(self):
         """Create connection status bar"""
@@ -441,13 +505,22 @@ class CentrifugeUI:
     def _auto_connect(self):
         """Try to automatically find and connect to Arduino"""
         ports = serial.tools.list_ports.comports()
-        for port in ports:
-            if 'Arduino' in port.description or 'USB' in port.description:
-                try:
-                    self._connect_to_port(port.device)
-                    return
-                except:
-                    pass
+        # Prefer ports identified by VID:PID; fall back to the description
+        candidates = [
+            p for p in ports
+            if (p.vid, p.pid) in ARDUINO_VIDPID or (p.vid, None) in ARDUINO_VIDPID
+        ]
+        if not candidates:
+            candidates = [
+                p for p in ports
+                if any(kw in p.description for kw in PORT_KEYWORDS)
+            ]
+        for port in candidates:
+            try:
+                self._connect_to_port(port.device)
+                return
+            except:
+                pass
         # If auto-connect fails, enable manual connect button
         self.connect_btn.config(state='normal')
 
@@ -466,103 +539,222 @@ class CentrifugeUI:
         """Connect to specific port"""
         try:
             self.serial_port = serial.Serial(port_name, 115200, timeout=1)
+            self._enable_low_latency()
             time.sleep(2)  # Wait for Arduino to reset
+            # Drop boot messages and partial frames sent during the reset
+            self.serial_port.reset_input_buffer()
+            self.serial_port.reset_output_buffer()
 
             self.serial_connected = True
             self.conn_status.config(text=f"Connected: {port_name}", fg='#27ae60')
             self.connect_btn.config(state='disabled')
             self.start_btn.config(state='normal')
 
-            # Start serial reading thread
-            self.serial_thread = threading.Thread(target=self._read_serial, daemon=True)
-            self.serial_thread.start()
+            # Start reading serial data
+            self._rx_buf.clear()
+            self._last.clear()
+            self._start_reader()
 
-            # Start ping thread for watchdog
-            threading.Thread(target=self._ping_watchdog, daemon=True).start()
+            # Start watchdog pings on the Tk event loop
+            self._ping_watchdog()
 
         except Exception as e:
             messagebox.showerror("Connection Error", f"Failed to connect: {str(e)}")
 
+    def _enable_low_latency(self):
+        """Ask the USB-serial driver to hand over bytes without batching"""
+        # FTDI/CH340 drivers otherwise hold bytes for a ~16 ms latency timer.
+        # pyserial only implements this on Linux (ASYNC_LOW_LATENCY).
+        try:
+            self.serial_port.set_low_latency_mode(True)
+        except (AttributeError, NotImplementedError, ValueError, OSError):
+            pass
+
+    def _start_reader(self):
+        """Read the port from Tk's event loop where possible, else a thread"""
+        # Tk file handlers are Unix-only; Windows keeps the reader thread
+        if hasattr(self.root.tk, 'createfilehandler'):
+            self.root.tk.createfilehandler(
+                self.serial_port.fileno(), tk.READABLE, self._on_serial_readable
+            )
+        else:
+            self.serial_thread = threading.Thread(target=self._read_serial, daemon=True)
+            self.serial_thread.start()
+
+    def _on_serial_readable(self, fd, mask):
+        """Tk file handler: drain the port and apply updates on the Tk thread"""
+        try:
+            self._rx_buf += self.serial_port.read(self.serial_port.in_waiting or 1)
+        except Exception as e:
+            print(f"Serial read error: {e}")
+            self.root.tk.deletefilehandler(fd)
+            self.serial_connected = False
+            return
+        updates = self._parse_rx_buf()
+        if updates:
+            self._apply_updates(updates)
+
     def _read_serial(self):
         """Read serial data in background thread"""
         while self.running_thread and self.serial_connected:
             try:
-                if self.serial_port and self.serial_port.in_waiting:
-                    line = self.serial_port.readline().decode('utf-8').strip()
-
-                    # Parse JSON status updates
-                    if line.startswith('{'):
-                        try:
-                            data = json.loads(line)
-                            self.root.after(0, lambda: self._update_from_arduino(data))
-                        except json.JSONDecodeError:
-                            pass
-
-                    # Handle text responses
-                    elif line.startswith('STATE:'):
-                        state = line.split(':')[1]
-                        self.root.after(0, lambda s=state: self.state.set(s))
-
-                    elif line.startswith('ERROR:'):
-                        error = line.split(':')[1]
-                        self.root.after(0, lambda e=error: messagebox.showerror("Arduino Error", e))
-
-                    elif line.startswith('STATUS:COMPLETE'):
-                        self.root.after(0, self._handle_completion)
-
-                time.sleep(0.05)  # Small delay to prevent CPU hogging
+                # Block until a byte arrives (or the port timeout expires),
+                # then drain everything already queued in one read
+                chunk = self.serial_port.read(1)
+                if not chunk:
+                    continue
+                self._rx_buf += chunk
+                waiting = self.serial_port.in_waiting
+                if waiting:
+                    self._rx_buf += self.serial_port.read(waiting)
+
+                # Hand the whole batch to Tk in a single callback
+                updates = self._parse_rx_buf()
+                if updates:
+                    self.root.after(0, self._apply_updates, updates)
 
             except Exception as e:
                 print(f"Serial read error: {e}")
                 self.serial_connected = False
 
+    def _parse_rx_buf(self):
+        """Parse every complete line in the receive buffer into UI updates"""
+        updates = []
+        while True:
+            end = self._rx_buf.find(b'\n')
+            if end < 0:
+                break
+            line = bytes(self._rx_buf[:end]).strip()
+            del self._rx_buf[:end + 1]
+            update = self._parse_line(line)
+            if update:
+                updates.append(update)
+        return updates
+
+    def _parse_line(self, line):
+        """Parse one raw line from the Arduino.
+
+        Status frames are queued for _drain_status; text responses are
+        returned as a (callback, args) UI update.
+        """
+        # Parse JSON status updates straight from bytes
+        if line.startswith(b'{'):
+            try:
+                self._pending_status.append(json_loads(line))
+            except ValueError:
+                pass
+            return None
+
+        # Handle text responses
+        prefix, sep, rest = line.partition(b':')
+        if not sep:
+            return None
+        handler = self._line_handlers.get(prefix)
+        if handler:
+            return handler(rest.decode('utf-8', errors='replace'))
+        return None
+
+    def _on_state_line(self, rest):
+        """STATE:<state>"""
+        # Runs in stream order: a status frame queued before this line is
+        # older and would roll the state back; frames after it are kept.
+        # Dropping the cached state makes the next frame re-apply colors.
+        self._pending_status.clear()
+        self._last.pop('state', None)
+        return self._set_state_text, (rest.split(':', 1)[0],)
+
+    def _on_error_line(self, rest):
+        """ERROR:<reason>[:<detail>]"""
+        return messagebox.showerror, ("Arduino Error", rest.split(':', 1)[0])
+
+    def _on_status_line(self, rest):
+        """STATUS:COMPLETE"""
+        if rest.startswith('COMPLETE'):
+            return self._handle_completion, ()
+        return None
+
+    def _apply_updates(self, updates):
+        """Apply a batch of parsed serial updates on the Tk thread"""
+        for callback, args in updates:
+            callback(*args)
+
+    def _set_state_text(self, state):
+        """Apply a STATE: line"""
+        self.state.set(state)
+
+    def _drain_status(self):
+        """Apply the newest queued status frame, then reschedule"""
+        # Reschedule first so a bad frame can't stop the display updating
+        self.root.after(33, self._drain_status)
+        try:
+            data = self._pending_status.pop()
+        except IndexError:
+            return
+        self._update_from_arduino(data)
+
+    def _send(self, payload):
+        """Write a command to the Arduino; every write also feeds its watchdog"""
+        self.serial_port.write(payload)
+        self._last_tx_monotonic = time.monotonic()
+
     def _ping_watchdog(self):
-        """Send periodic ping to Arduino watchdog"""
-        while self.running_thread and self.serial_connected:
+        """Tk timer: ping the Arduino watchdog if the link has been idle too long"""
+        if not (self.running_thread and self.serial_connected):
+            return
+        idle = time.monotonic() - self._last_tx_monotonic
+        if idle >= PING_INTERVAL:
             try:
-                if self.serial_port:
-                    self.serial_port.write(b'PING\n')
-                time.sleep(2)  # Ping every 2 seconds
+                self._send(b'PING\n')
             except:
                 pass
+            idle = 0
+        self.root.after(int((PING_INTERVAL - idle) * 1000), self._ping_watchdog)
 
     def _update_from_arduino(self, data):
-        """Update UI from Arduino status data"""
-        if 'currentRPM' in data:
-            self.current_rpm.set(data['currentRPM'])
-
-        if 'state' in data:
-            self.state.set(data['state'])
-            self._update_state_color(data['state'])
-
-        if 'lidClosed' in data:
-            lid_closed = data['lidClosed']
-            color = '#27ae60' if lid_closed else '#e74c3c'
-            text = f"🔒 Lid: {'Closed' if lid_closed else 'Open'}"
-            self.lid_indicator.config(text=text, fg=color)
-
-        if 'level' in data:
-            level = data['level']
-            color = '#27ae60' if level else '#e74c3c'
-            text = f"📍 Level: {'OK' if level else 'Tilted'}"
-            self.level_indicator.config(text=text, fg=color)
-
-        if 'remainingMs' in data:
-            remaining_sec = data['remainingMs'] // 1000
-            mins = remaining_sec // 60
-            secs = remaining_sec % 60
-            self.time_label.config(text=f"{mins:02d}:{secs:02d}")
+        """Update UI from Arduino status data, skipping unchanged fields"""
+        last = self._last
+        for key, apply in self._status_fields:
+            value = data.get(key, _MISSING)
+            if value is _MISSING or value == last.get(key):
+                continue
+            apply(value)
+            last[key] = value
+
+    def _show_rpm(self, rpm):
+        """Show current RPM"""
+        self.current_rpm.set(rpm)
+
+    def _show_state(self, state):
+        """Show state text and color"""
+        self.state.set(state)
+        self._update_state_color(state)
+
+    def _show_lid(self, lid_closed):
+        """Show lid indicator"""
+        color = '#27ae60' if lid_closed else '#e74c3c'
+        text = f"🔒 Lid: {'Closed' if lid_closed else 'Open'}"
+        self.lid_indicator.config(text=text, fg=color)
+
+    def _show_level(self, level):
+        """Show level indicator"""
+        color = '#27ae60' if level else '#e74c3c'
+        text = f"📍 Level: {'OK' if level else 'Tilted'}"
+        self.level_indicator.config(text=text, fg=color)
+
+    def _show_remaining(self, remaining_ms):
+        """Show time remaining"""
+        # The display has 1 s resolution, so compare whole seconds
+        remaining_sec = remaining_ms // 1000
+        if remaining_sec == self._last.get('remaining_sec'):
+            return
+        mins = remaining_sec // 60
+        secs = remaining_sec % 60
+        self.time_label.config(text=f"{mins:02d}:{secs:02d}")
+        self._last['remaining_sec'] = remaining_sec
 
     def _update_state_color(self, state):
         """Update state label color based on state"""
-        color_map = {
-            'IDLE': '#27ae60',
-            'RAMPING_UP': '#f39c12',
-            'RUNNING': '#27ae60',
-            'RAMPING_DOWN': '#e67e22',
-            'ERROR': '#e74c3c'
-        }
-        self.state_label.config(fg=color_map.get(state, '#95a5a6'))
+        self.state_label.config(fg=STATE_COLORS.get(state, '#95a5a6'))
 
     def _handle_completion(self):
         """Handle centrifugation completion"""
@@ -644,8 +836,8 @@ class CentrifugeUI:
         if response:
             # Send START command to Arduino
             duration_ms = self.target_duration_sec.get() * 1000
-            cmd = f"START:{self.target_rpm.get()}:{duration_ms}\n"
-            self.serial_port.write(cmd.encode())
+            cmd = b"START:%d:%d\n" % (self.target_rpm.get(), duration_ms)
+            self._send(cmd)
 
             self.is_running = True
             self.start_btn.config(state='disabled')
@@ -659,7 +851,7 @@ class CentrifugeUI:
         )
 
         if response:
-            self.serial_port.write(b'STOP\n')
+            self._send(b'STOP\n')
 
     def __del__(self):
         """Cleanup on exit"""
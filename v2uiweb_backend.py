@@ -4,12 +4,21 @@ Run with: python app.py
 Then open http://localhost:5000 in your browser.
 """
 
-from flask import Flask, jsonify, request, render_template_string
+from flask import Flask, Response, jsonify, request
 import threading
 import time
 import json
+import zlib
 from pathlib import Path
 
+# orjson encodes straight to bytes and is much faster; it's optional
+try:
+    import orjson
+    json_dumps = orjson.dumps
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
 # Import your existing serial controller
 try:
     from serial_controller import SerialController, SystemState, ArduinoStatus
@@ -18,14 +27,39 @@ except ImportError:
     SERIAL_AVAILABLE = False
     print("Warning: serial_controller.py not found. Running in demo mode.")
 
+# waitress is a production WSGI server (async socket I/O, fixed thread pool)
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
 app = Flask(__name__)
 
+# The page has no Jinja expressions, so it's read once and served as-is
+INDEX_HTML = Path(__file__).with_name("v2ui_cute_frontend.html").read_text(encoding="utf-8")
+
 # ==================== SHARED STATE ====================
-# This dict is written by the serial thread and read by Flask routes.
-# Using a lock to keep it thread-safe.
+# shared_state_ref[0] is a snapshot dict that is never mutated in place:
+# writers build a new dict and rebind it, so Flask routes can read it
+# without taking a lock. The lock only serializes writers; status_cv shares
+# it and wakes /api/status/stream clients whenever a new snapshot lands.
+# shared_state_body is (json_bytes, etag) for the snapshot, encoded once
+# per update so status requests never re-encode it. It's one tuple so a
+# reader can't pair a new ETag with an old body.
 
 state_lock = threading.Lock()
-shared_state = {
+status_cv = threading.Condition(state_lock)
+STREAM_KEEPALIVE_SEC = 15
+
+# Each open status stream holds a server worker thread. Streams are capped
+# and end after STREAM_MAX_SEC (EventSource reconnects on its own), so
+# stop/emergency-stop requests always find a free worker.
+SERVER_THREADS = 8
+MAX_STREAMS = SERVER_THREADS // 2
+STREAM_MAX_SEC = 60
+stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+shared_state_ref = [{
     "state": "DISCONNECTED",
     "current_rpm": 0,
     "target_rpm": 0,
@@ -37,38 +71,50 @@ shared_state = {
     "error_reason": "",
     "last_updated": 0,
     "connected": False,
-}
+}]
+
+def encode_state(state):
+    """Return (json_bytes, etag) for a state snapshot."""
+    body = json_dumps(state)
+    return body, format(zlib.crc32(body), "08x")
+
+shared_state_body = encode_state(shared_state_ref[0])
+
+def update_shared_state(changes):
+    """Publish a new shared state snapshot with `changes` applied."""
+    global shared_state_body
+    with status_cv:
+        new_state = {**shared_state_ref[0], **changes}
+        shared_state_body = encode_state(new_state)
+        shared_state_ref[0] = new_state
+        status_cv.notify_all()
 
 # ==================== SERIAL CONTROLLER SETUP ====================
 controller = None
 
 def on_status(status):
-    with state_lock:
-        shared_state.update({
-            "state": status.state.value,
-            "current_rpm": status.current_rpm,
-            "target_rpm": status.target_rpm,
-            "pwm": status.pwm,
-            "lid_closed": status.lid_closed,
-            "level": status.level,
-            "running": status.running,
-            "remaining_ms": status.remaining_ms,
-            "error_reason": status.error_reason,
-            "last_updated": status.last_updated,
-            "connected": True,
-        })
+    update_shared_state({
+        "state": status.state.value,
+        "current_rpm": status.current_rpm,
+        "target_rpm": status.target_rpm,
+        "pwm": status.pwm,
+        "lid_closed": status.lid_closed,
+        "level": status.level,
+        "running": status.running,
+        "remaining_ms": status.remaining_ms,
+        "error_reason": status.error_reason,
+        "last_updated": status.last_updated,
+        "connected": True,
+    })
 
 def on_error(reason):
-    with state_lock:
-        shared_state["state"] = "ERROR"
-        shared_state["error_reason"] = reason
-        if reason == "SERIAL_DISCONNECTED":
-            shared_state["connected"] = False
+    changes = {"state": "ERROR", "error_reason": reason}
+    if reason == "SERIAL_DISCONNECTED":
+        changes["connected"] = False
+    update_shared_state(changes)
 
 def on_complete():
-    with state_lock:
-        shared_state["state"] = "IDLE"
-        shared_state["running"] = False
+    update_shared_state({"state": "IDLE", "running": False})
 
 def init_controller():
     global controller
@@ -81,19 +127,58 @@ def init_controller():
         on_complete=on_complete,
     )
     connected = controller.connect()
-    with state_lock:
-        shared_state["connected"] = connected
+    update_shared_state({"connected": connected})
     return connected
 
 # ==================== ROUTES ====================
 @app.route("/")
 def index():
-    return render_template_string(open("v2ui_cute_frontend.html", encoding="utf-8").read())
+    return Response(INDEX_HTML, mimetype="text/html")
 
 @app.route("/api/status")
 def get_status():
-    with state_lock:
-        return jsonify(dict(shared_state))
+    body, etag = shared_state_body
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    # no-cache makes browsers revalidate every poll, so they send If-None-Match
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/api/status/stream")
+def status_stream():
+    """Server-Sent Events: push each new status snapshot as it's published."""
+    if not stream_slots.acquire(blocking=False):
+        return jsonify({"ok": False, "error": "Too many status streams"}), 503
+
+    def events():
+        deadline = time.monotonic() + STREAM_MAX_SEC
+        last = None
+        yield b"retry: 1000\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Tell the client this close is planned, then free the worker
+                yield b"event: reconnect\ndata:\n\n"
+                return
+            with status_cv:
+                if shared_state_ref[0] is last:
+                    status_cv.wait(timeout=min(STREAM_KEEPALIVE_SEC, remaining))
+                state = shared_state_ref[0]
+                payload = shared_state_body[0]
+            if state is last:
+                # Comment line keeps proxies from closing an idle stream
+                yield b": keep-alive\n\n"
+                continue
+            last = state
+            yield b"data: " + payload + b"\n\n"
+
+    response = Response(events(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache"})
+    response.call_on_close(stream_slots.release)
+    return response
 
 @app.route("/api/start", methods=["POST"])
 def start():
@@ -106,47 +191,43 @@ def start():
     if duration_sec <= 0 or duration_sec > 600:
         return jsonify({"ok": False, "error": "Duration must be between 1 and 600 seconds"}), 400
 
-    if controller and shared_state["connected"]:
+    if controller and shared_state_ref[0]["connected"]:
         ok = controller.start(rpm, duration_sec)
     else:
         # Demo mode: simulate state change
-        with state_lock:
-            shared_state.update({
-                "state": "RAMPING_UP",
-                "target_rpm": rpm,
-                "running": True,
-            })
+        update_shared_state({
+            "state": "RAMPING_UP",
+            "target_rpm": rpm,
+            "running": True,
+        })
         ok = True
 
     return jsonify({"ok": ok})
 
 @app.route("/api/stop", methods=["POST"])
 def stop():
-    if controller and shared_state["connected"]:
+    if controller and shared_state_ref[0]["connected"]:
         ok = controller.stop()
     else:
-        with state_lock:
-            shared_state.update({"state": "RAMPING_DOWN"})
+        update_shared_state({"state": "RAMPING_DOWN"})
         ok = True
     return jsonify({"ok": ok})
 
 @app.route("/api/emergency_stop", methods=["POST"])
 def emergency_stop():
-    if controller and shared_state["connected"]:
+    if controller and shared_state_ref[0]["connected"]:
         ok = controller.emergency_stop()
     else:
-        with state_lock:
-            shared_state.update({"state": "ERROR", "running": False, "current_rpm": 0})
+        update_shared_state({"state": "ERROR", "running": False, "current_rpm": 0})
         ok = True
     return jsonify({"ok": ok})
 
 @app.route("/api/clear_error", methods=["POST"])
 def clear_error():
-    if controller and shared_state["connected"]:
+    if controller and shared_state_ref[0]["connected"]:
         ok = controller.clear_error()
     else:
-        with state_lock:
-            shared_state.update({"state": "IDLE", "error_reason": ""})
+        update_shared_state({"state": "IDLE", "error_reason": ""})
         ok = True
     return jsonify({"ok": ok})
 
@@ -158,8 +239,7 @@ def reconnect():
         if port:
             controller.port = port
         ok = controller.connect()
-        with state_lock:
-            shared_state["connected"] = ok
+        update_shared_state({"connected": ok})
         return jsonify({"ok": ok})
     return jsonify({"ok": False, "error": "Controller not initialized"})
 
@@ -176,4 +256,8 @@ if __name__ == "__main__":
     print("Initializing serial connection...")
     init_controller()
     print("Starting web server at http://localhost:5000")
-    app.run(debug=False, host="0.0.0.0", port=5000, threaded=True)
\ No newline at end of file
+    if WAITRESS_AVAILABLE:
+        serve(app, host="0.0.0.0", port=5000, threads=SERVER_THREADS)
+    else:
+        print("Warning: waitress not installed. Using Flask's development server.")
+        app.run(debug=False, host="0.0.0.0", port=5000, threaded=True)
\ No newline at end of file